@@ -1,8 +1,15 @@
+import asyncio
+import bisect
 import csv
+import io
 import os
-from dataclasses import dataclass, field, asdict
-from datetime import datetime
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import date
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from rich.text import Text  # Importa Text
 from textual import on
@@ -23,7 +30,7 @@ from textual.widgets import (
 
 # --- Struttura Dati ---
 
-@dataclass
+@dataclass(slots=True)
 class Book:
     book_id: int
     title: str
@@ -38,6 +45,7 @@ class Book:
     my_review: str = ""
     isbn13: str = "0000000000000"
     is_reading: bool = field(init=False, repr=False)
+    _row_cache: Optional[Tuple[Text, ...]] = field(default=None, init=False, repr=False, compare=False) # Celle già renderizzate per la tabella
 
     def __post_init__(self):
         self.is_reading = self.exclusive_shelf == "currently-reading"
@@ -45,65 +53,243 @@ class Book:
 # --- Logica di Gestione Dati ---
 
 DB_CSV = "my_library.csv"
+NUMERIC_FIELDS = {"my_rating", "year_published"}
+ROW_CHUNK_SIZE = 100 # Righe aggiunte alla tabella per ogni ciclo di refresh
+PARALLEL_IMPORT_THRESHOLD = 50 * 1024 * 1024 # Byte oltre i quali l'importazione viene parallelizzata
+
+_NULL_ISBN = "0000000000000"
 
 def clean_isbn(isbn: str) -> str:
+    # Il controllo sulla lunghezza scarta subito i valori vuoti (="") degli export Goodreads
     cleaned = isbn.strip('="')
-    return cleaned if cleaned.isdigit() and len(cleaned) == 13 else "0000000000000"
+    return cleaned if len(cleaned) == 13 and cleaned.isdigit() else _NULL_ISBN
+
+# Tabella precalcolata: indice = rating (0-5)
+_STARS = tuple("★" * i + "☆" * (5 - i) for i in range(6))
+_STARS_DEFAULT = "☆☆☆☆☆"
 
 def rating_to_stars(rating: int) -> str:
-    if not isinstance(rating, int) or not (0 <= rating <= 5):
-        return "☆☆☆☆☆"
-    return "★" * rating + "☆" * (5 - rating)
+    return _STARS[rating] if isinstance(rating, int) and 0 <= rating <= 5 else _STARS_DEFAULT
+
+# Intestazioni note dell'export Goodreads -> nomi dei campi di Book
+_GOODREADS_MAP = {
+    "Book Id": "book_id",
+    "Title": "title",
+    "Author": "author",
+    "ISBN13": "isbn13",
+    "My Rating": "my_rating",
+    "Publisher": "publisher",
+    "Year Published": "year_published",
+    "Date Read": "date_read",
+    "Date Added": "date_added",
+    "Bookshelves": "bookshelves",
+    "Exclusive Shelf": "exclusive_shelf",
+    "My Review": "my_review",
+}
+
+def render_row(book: Book) -> Tuple[Text, ...]:
+    # Le celle sono calcolate una sola volta per libro e riutilizzate a ogni riordino.
+    # Modificare un libro ne crea uno nuovo (BookFormScreen), quindi la cache non diventa obsoleta.
+    if book._row_cache is not None:
+        return book._row_cache
+
+    current_style_args = {"style": "on yellow black"} if book.is_reading else {}
+
+    # Converte tutti i valori delle celle in Text stilizzato se necessario
+    # Nota: rating_to_stars già restituisce una stringa, che Text può gestire.
+    # I valori numerici o None devono essere convertiti in stringa.
+    book._row_cache = (
+        Text(book.author or "", **current_style_args),
+        Text(book.title or "", **current_style_args),
+        Text(rating_to_stars(book.my_rating), **current_style_args),
+        Text(book.publisher or "", **current_style_args),
+        Text(str(book.year_published) if book.year_published else "", **current_style_args),
+        Text(book.date_read or "", **current_style_args),
+        Text(book.date_added or "", **current_style_args),
+        Text(book.bookshelves or "", **current_style_args),
+        Text(book.isbn13 or "0000000000000", **current_style_args),
+        Text(book.my_review or "", **current_style_args),
+    )
+    return book._row_cache
+
+def _to_int(value: str) -> int:
+    # Caso comune: stringa vuota o intero già ben formato; float() solo per valori come "4.0".
+    # I valori non numerici sollevano ValueError, così la riga viene scartata come prima.
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+def _rows_to_books(header: List[str], rows: Iterable[Sequence[str]], is_initial_import: bool = False, dedup: bool = True) -> List[Book]:
+    books = []
+    seen_ids: set[int] = set()
+    if is_initial_import:
+        header = [
+            _GOODREADS_MAP.get(name) or name.lower().replace(' ', '_').replace('-', '_')
+            for name in header
+        ]
+
+    # Indici delle colonne risolti una sola volta dall'intestazione (-1 se assente)
+    idx = {name: i for i, name in enumerate(header)}
+    i_book_id = idx.get("book_id", -1)
+    i_title = idx.get("title", -1)
+    i_author = idx.get("author", -1)
+    i_isbn13 = idx.get("isbn13", -1)
+    i_my_rating = idx.get("my_rating", -1)
+    i_publisher = idx.get("publisher", -1)
+    i_year_published = idx.get("year_published", -1)
+    i_date_read = idx.get("date_read", -1)
+    i_date_added = idx.get("date_added", -1)
+    i_bookshelves = idx.get("bookshelves", -1)
+    i_my_review = idx.get("my_review", -1)
+    i_exclusive_shelf = idx.get("exclusive_shelf", -1)
+    if i_book_id < 0:
+        return []
+    n_columns = len(header)
+
+    for row in rows:
+        if len(row) < n_columns:
+            # Righe più corte dell'intestazione (es. celle finali vuote rimosse): le celle mancanti valgono ""
+            row = [*row, *("",) * (n_columns - len(row))]
+        try:
+            book_id_str = row[i_book_id]
+            if not book_id_str: continue
+
+            book_id = int(book_id_str)
+            if dedup and book_id in seen_ids:
+                continue
+
+            books.append(
+                Book(
+                    book_id=book_id,
+                    title=row[i_title] if i_title >= 0 else "N/A",
+                    author=row[i_author] if i_author >= 0 else "N/A",
+                    isbn13=clean_isbn(row[i_isbn13] if i_isbn13 >= 0 else ""),
+                    my_rating=_to_int(row[i_my_rating] if i_my_rating >= 0 else ""), # Tollerante a stringhe vuote per my_rating
+                    publisher=row[i_publisher] if i_publisher >= 0 else "",
+                    year_published=_to_int(row[i_year_published] if i_year_published >= 0 else ""), # Tollerante a stringhe vuote per year_published
+                    date_read=row[i_date_read] if i_date_read >= 0 else "",
+                    date_added=row[i_date_added] if i_date_added >= 0 else "",
+                    bookshelves=row[i_bookshelves] if i_bookshelves >= 0 else "",
+                    my_review=(row[i_my_review] if i_my_review >= 0 else "").replace('<br/>', '\n'),
+                    exclusive_shelf=row[i_exclusive_shelf] if i_exclusive_shelf >= 0 else "to-read",
+                )
+            )
+            if dedup:
+                seen_ids.add(book_id)
+        except (ValueError, TypeError):
+            continue
+    return books
+
+@lru_cache(maxsize=None)
+def _load_pyarrow() -> Optional[Tuple[Any, Any]]:
+    # pyarrow è opzionale e serve solo all'importazione iniziale: viene importato
+    # alla prima richiesta per non rallentare ogni avvio. None se non è installato.
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pv
+    except ImportError:
+        return None
+    return pa, pv
+
+def _read_rows_with_arrow(data: bytes) -> Optional[Tuple[List[str], Iterable[Sequence[str]]]]:
+    # Legge l'intestazione per forzare tutte le colonne a stringa: le conversioni
+    # (ISBN con ="...", rating vuoti, ecc.) restano quelle tolleranti di _rows_to_books.
+    pa, pv = _load_pyarrow()
+    header = next(csv.reader([data.partition(b"\n")[0].decode("utf-8")]), None)
+    if not header:
+        return None
+    try:
+        table = pv.read_csv(
+            pa.BufferReader(data),
+            parse_options=pv.ParseOptions(newlines_in_values=True),
+            convert_options=pv.ConvertOptions(column_types={name: pa.string() for name in header}),
+        )
+    except pa.ArrowInvalid:
+        return None # File non gestibile da pyarrow: si ripiega sul modulo csv
+    return table.column_names, zip(*(column.to_pylist() for column in table.columns))
+
+def _parse_csv_range(filename: str, start: int, end: int, header: List[str]) -> List[Book]:
+    with open(filename, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _rows_to_books(header, csv.reader(io.StringIO(data.decode("utf-8"), newline="")), is_initial_import=True, dedup=False)
+
+def _load_books_parallel(filename: str) -> List[Book]:
+    # Divide il file in intervalli di byte che iniziano sempre con un nuovo record e li fa
+    # analizzare a processi separati. I campi tra virgolette possono contenere a capo
+    # (es. my_review), quindi un a capo chiude un record solo se il numero di virgolette
+    # viste fin lì è pari: le virgolette di escape ("") non cambiano la parità.
+    workers = os.cpu_count() or 1
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]), None)
+        if not header:
+            return []
+        pos = f.tell()
+        boundaries = [pos]
+        quotes = 0 # Virgolette contate dall'inizio dei dati fino a pos
+        for i in range(1, workers):
+            target = max(size * i // workers, pos)
+            quotes += f.read(target - pos).count(b'"')
+            while True: # Avanza fino a una fine riga esterna alle virgolette
+                line = f.readline()
+                quotes += line.count(b'"')
+                if not line or quotes % 2 == 0:
+                    break
+            pos = f.tell()
+            boundaries.append(pos)
+    boundaries.append(size)
 
-def load_books_from_csv(filename: str, is_initial_import: bool = False) -> List[Book]:
     books = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_parse_csv_range, filename, start, end, header)
+            for start, end in zip(boundaries, boundaries[1:]) if start < end
+        ]
+        for future in futures: # In ordine, per mantenere l'ordine delle righe del file
+            books.extend(future.result())
+    return books
+
+def load_books_from_csv(filename: str, is_initial_import: bool = False, dedup: bool = True) -> List[Book]:
+    # dedup=False salta il controllo dei book_id duplicati, per sorgenti che ne garantiscono
+    # l'unicità (gli export Goodreads hanno un "Book Id" univoco per riga).
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if is_initial_import:
-                reader.fieldnames = [name.lower().replace(' ', '_').replace('-', '_') for name in reader.fieldnames]
-
-            for row in reader:
-                try:
-                    book_id_str = row.get("book_id") or row.get("book_id")
-                    if not book_id_str: continue
-
-                    book_id = int(book_id_str)
-                    if any(b.book_id == book_id for b in books):
-                        continue
-                        
-                    books.append(
-                        Book(
-                            book_id=book_id,
-                            title=row.get("title", "N/A"),
-                            author=row.get("author", "N/A"),
-                            isbn13=clean_isbn(row.get("isbn13", "")),
-                            my_rating=int(float(row.get("my_rating") or 0)), # Tollerante a stringhe vuote per my_rating
-                            publisher=row.get("publisher", ""),
-                            year_published=int(float(row.get("year_published") or 0)), # Tollerante a stringhe vuote per year_published
-                            date_read=row.get("date_read", ""),
-                            date_added=row.get("date_added", ""),
-                            bookshelves=row.get("bookshelves", ""),
-                            my_review=row.get("my_review", "").replace('<br/>', '\n'),
-                            exclusive_shelf=row.get("exclusive_shelf", "to-read"),
-                        )
-                    )
-                except (ValueError, TypeError):
-                    continue
+        # Senza pyarrow (già multithread), gli export molto grandi vengono analizzati in parallelo.
+        # Solo senza controllo dei duplicati: i blocchi sono analizzati indipendentemente.
+        if (is_initial_import and not dedup and _load_pyarrow() is None
+                and os.path.getsize(filename) > PARALLEL_IMPORT_THRESHOLD):
+            return _load_books_parallel(filename)
+
+        # Il file viene letto in un'unica chiamata e decodificato in blocco
+        # invece di passare per il decoder incrementale di un file di testo.
+        with open(filename, "rb") as f:
+            data = f.read()
     except FileNotFoundError:
         return []
-    return books
+
+    # Per l'importazione iniziale (export Goodreads, anche decine di migliaia di righe)
+    # si usa il parser C di pyarrow, se installato.
+    if is_initial_import and _load_pyarrow() is not None:
+        result = _read_rows_with_arrow(data)
+        if result is not None:
+            return _rows_to_books(*result, is_initial_import=is_initial_import, dedup=dedup)
+
+    reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+    header = next(reader, None)
+    if header is None:
+        return []
+    return _rows_to_books(header, reader, is_initial_import, dedup)
 
 def save_books_to_csv(filename: str, books: List[Book]):
     if not books: return
-    fieldnames = [f.name for f in Book.__dataclass_fields__.values() if f.name != 'is_reading']
+    fieldnames = [f.name for f in fields(Book) if f.init] # Esclude i campi derivati (is_reading, _row_cache)
     with open(filename, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for book in books:
-            book_dict = asdict(book)
-            book_dict.pop('is_reading', None)
-            writer.writerow(book_dict)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(map(attrgetter(*fieldnames), books)) # attrgetter con più nomi restituisce già la tupla della riga
 
 # --- Schermate Modali ---
 
@@ -182,7 +368,7 @@ class BookFormScreen(ModalScreen[Optional[Book]]):
                 return
 
             book_id = self.book_to_edit.book_id if self.book_to_edit else self.app.get_next_book_id()
-            date_added = self.book_to_edit.date_added if self.book_to_edit else datetime.now().strftime("%Y/%m/%d")
+            date_added = self.book_to_edit.date_added if self.book_to_edit else self.app.today_str()
 
             new_book = Book(
                 book_id=book_id, title=title, author=author,
@@ -247,7 +433,16 @@ class BookTrackerApp(App):
 
     def __init__(self):
         super().__init__()
-        self.books: List[Book] = []
+        self._by_id: Dict[int, Book] = {} # Libreria indicizzata per book_id, in ordine di inserimento
+        self._max_id: int = 0 # book_id più alto assegnato finora
+        self._position: Dict[int, int] = {} # book_id -> posizione nella libreria, per i pari merito
+        self._next_position: int = 0
+        self._today_date: Optional[date] = None
+        self._today_str: str = ""
+        self._reading_sorted: List[Book] = [] # Libri "currently-reading", ordinati per sort_by
+        self._other_sorted: List[Book] = [] # Tutti gli altri libri, ordinati per sort_by
+        self._displayed_books: List[Book] = [] # Libri nell'ordine in cui compaiono nella tabella
+        self._populate_generation: int = 0 # Incrementato a ogni ricostruzione della tabella
         self.current_search_term: str = "" # Per memorizzare il termine di ricerca
         self.table = DataTable(id="book-table")
         self.columns = [
@@ -285,64 +480,113 @@ class BookTrackerApp(App):
             self.load_and_display_books(DB_CSV)
 
     def load_and_display_books(self, path: str, is_initial_import: bool = False):
-        self.books = load_books_from_csv(path, is_initial_import)
-        if is_initial_import and self.books:
-            self.notify(f"Importati {len(self.books)} libri da '{os.path.basename(path)}'.")
+        # L'export Goodreads ha id univoci: il controllo dei duplicati serve solo rileggendo il database
+        # Se comunque ci fossero id ripetuti, vince la prima occorrenza (come con dedup=True)
+        self._by_id = {}
+        for book in load_books_from_csv(path, is_initial_import, dedup=not is_initial_import):
+            self._by_id.setdefault(book.book_id, book)
+        self._position = {book_id: i for i, book_id in enumerate(self._by_id)}
+        self._next_position = len(self._position)
+        self._max_id = max(self._by_id, default=0)
+        if is_initial_import and self._by_id:
+            self.notify(f"Importati {len(self._by_id)} libri da '{os.path.basename(path)}'.")
         self.refresh_table()
 
+    @property
+    def books(self) -> List[Book]:
+        return list(self._by_id.values())
+
     def get_next_book_id(self) -> int:
-        if not self.books: return 1
-        return max(int(book.book_id) for book in self.books) + 1
+        return self._max_id + 1
+
+    def today_str(self) -> str:
+        # La data formattata viene ricalcolata solo quando cambia il giorno
+        today = date.today()
+        if today != self._today_date:
+            self._today_date = today
+            self._today_str = today.strftime("%Y/%m/%d")
+        return self._today_str
+
+    def sort_key(self) -> Callable[[Book], Any]:
+        getter = attrgetter(self.sort_by)
+        if self.sort_by in NUMERIC_FIELDS:
+            return getter # Interi: confronto numerico diretto, senza conversione a stringa
+        return lambda x: getter(x) or ""
+
+    def partition_key(self) -> Callable[[Book], Tuple[Any, int]]:
+        # A parità di chiave decide la posizione nella libreria, come l'ordinamento stabile
+        # dell'intera lista: ogni libro ha così un posto univoco, anche dopo insert_sorted.
+        key_func = self.sort_key()
+        position = self._position
+        return lambda b: (key_func(b), position[b.book_id])
+
+    def sort_partitions(self):
+        # Le partizioni sono sempre in ordine crescente: l'ordine decrescente
+        # viene ricavato da queste in populate_table.
+        reading_books: List[Book] = []
+        other_books: List[Book] = []
+        for book in self._by_id.values(): # Una sola passata sulla libreria per entrambe le partizioni
+            (reading_books if book.is_reading else other_books).append(book)
+        key_func = self.partition_key()
+        reading_books.sort(key=key_func)
+        other_books.sort(key=key_func)
+        self._reading_sorted = reading_books
+        self._other_sorted = other_books
+
+    def insert_sorted(self, book: Book):
+        partition = self._reading_sorted if book.is_reading else self._other_sorted
+        bisect.insort(partition, book, key=self.partition_key())
+
+    def remove_sorted(self, book: Book):
+        partition = self._reading_sorted if book.is_reading else self._other_sorted
+        key_func = self.partition_key()
+        del partition[bisect.bisect_left(partition, key_func(book), key=key_func)]
+
+    def replace_sorted(self, old_book: Book, new_book: Book):
+        # Il book_id (e quindi la posizione nella libreria) non cambia con la modifica
+        self.remove_sorted(old_book)
+        self.insert_sorted(new_book)
+
+    def descending(self, partition: List[Book]) -> List[Book]:
+        # Inverte l'ordine dei gruppi di pari merito ma non quello interno a ciascun gruppo,
+        # che resta l'ordine della libreria come con sorted(..., reverse=True).
+        groups = [list(group) for _, group in groupby(partition, key=self.sort_key())]
+        return [book for group in reversed(groups) for book in group]
 
     def refresh_table(self):
-        self.table.clear()
-        
-        search_term = self.current_search_term.lower() # Usa il termine di ricerca memorizzato
+        self.sort_partitions()
+        self.populate_table()
 
-        if search_term:
-            # Filtra prima in base al termine di ricerca
-            current_list = [
-                book for book in self.books
-                if search_term in book.title.lower() or search_term in book.author.lower()
-            ]
+    def populate_table(self):
+        if self.sort_reverse:
+            processed_books = self.descending(self._reading_sorted) + self.descending(self._other_sorted)
         else:
-            current_list = self.books[:]
+            processed_books = self._reading_sorted + self._other_sorted
 
-        sort_attr = self.sort_by
-        sort_reverse = self.sort_reverse
-        
-        key_func = lambda x: str(getattr(x, sort_attr) or "")
-        
-        # Applica l'ordinamento alla lista già filtrata (o completa se non c'è ricerca)
-        reading_books = sorted([b for b in current_list if b.is_reading], key=key_func, reverse=sort_reverse)
-        other_books = sorted([b for b in current_list if not b.is_reading], key=key_func, reverse=sort_reverse)
-        
-        processed_books = reading_books + other_books
-
-        for book in processed_books:
-            current_style_args = {"style": "on yellow black"} if book.is_reading else {}
-
-            # Converte tutti i valori delle celle in Text stilizzato se necessario
-            # Nota: rating_to_stars già restituisce una stringa, che Text può gestire.
-            # I valori numerici o None devono essere convertiti in stringa.
-
-            cells_data = [
-                Text(book.author or "", **current_style_args),
-                Text(book.title or "", **current_style_args),
-                Text(rating_to_stars(book.my_rating), **current_style_args),
-                Text(book.publisher or "", **current_style_args),
-                Text(str(book.year_published) if book.year_published else "", **current_style_args),
-                Text(book.date_read or "", **current_style_args),
-                Text(book.date_added or "", **current_style_args),
-                Text(book.bookshelves or "", **current_style_args),
-                Text(book.isbn13 or "0000000000000", **current_style_args),
-                Text(book.my_review or "", **current_style_args)
+        search_term = self.current_search_term.lower() # Usa il termine di ricerca memorizzato
+        if search_term:
+            # Filtra la lista già ordinata in base al termine di ricerca
+            processed_books = [
+                book for book in processed_books
+                if search_term in book.title.lower() or search_term in book.author.lower()
             ]
 
-            self.table.add_row(
-                *cells_data,
-                key=str(book.book_id)
-            )
+        # La riga i della tabella corrisponde a _displayed_books[i]. Il primo blocco di righe
+        # viene inserito subito, i successivi dopo ogni refresh per non bloccare l'interfaccia.
+        self._displayed_books = processed_books
+        self._populate_generation += 1
+        with self.batch_update(): # Svuotamento e primo blocco in un unico aggiornamento dello schermo
+            self.table.clear()
+            self.add_row_chunk(self._populate_generation, 0)
+
+    def add_row_chunk(self, generation: int, start: int):
+        if generation != self._populate_generation:
+            return # Nel frattempo la tabella è stata ricostruita: questo blocco è obsoleto
+        end = start + ROW_CHUNK_SIZE
+        with self.batch_update():
+            self.table.add_rows([render_row(book) for book in self._displayed_books[start:end]])
+        if end < len(self._displayed_books):
+            self.call_after_refresh(self.add_row_chunk, generation, end)
 
     @on(DataTable.HeaderSelected)
     def on_header_selected(self, event: DataTable.HeaderSelected):
@@ -353,53 +597,58 @@ class BookTrackerApp(App):
                 break
         
         if self.sort_by == new_sort_by:
+            # Stessa colonna: cambia solo il verso, le partizioni ordinate restano valide
             self.sort_reverse = not self.sort_reverse
+            self.populate_table()
         else:
             self.sort_by = new_sort_by
             self.sort_reverse = False
-        
-        self.refresh_table()
+            self.refresh_table()
 
     def action_add_book(self):
         def on_dismiss(new_book: Optional[Book]):
             if new_book:
-                self.books.append(new_book)
-                self.refresh_table()
+                self._by_id[new_book.book_id] = new_book
+                self._max_id = max(self._max_id, new_book.book_id)
+                self._position[new_book.book_id] = self._next_position
+                self._next_position += 1
+                self.insert_sorted(new_book)
+                self.populate_table()
                 self.notify(f"Libro '{new_book.title}' aggiunto.", title="Successo")
         self.push_screen(BookFormScreen(), on_dismiss)
 
     def action_edit_book(self):
-        if self.table.cursor_row < 0:
+        if not 0 <= self.table.cursor_row < len(self._displayed_books):
             self.notify("Seleziona un libro da modificare.", title="Attenzione", severity="warning")
             return
         
-        book_id = int(self.table.get_row_key(self.table.cursor_row))
-        book_to_edit = next((b for b in self.books if b.book_id == book_id), None)
+        book_id = self._displayed_books[self.table.cursor_row].book_id
+        book_to_edit = self._by_id.get(book_id)
         if not book_to_edit: return
 
         def on_dismiss(updated_book: Optional[Book]):
             if updated_book:
-                for i, book in enumerate(self.books):
-                    if book.book_id == updated_book.book_id:
-                        self.books[i] = updated_book
-                        break
-                self.refresh_table()
+                self._by_id[updated_book.book_id] = updated_book # Mantiene la posizione originale
+                self.replace_sorted(book_to_edit, updated_book)
+                self.populate_table()
                 self.notify(f"Libro '{updated_book.title}' modificato.", title="Successo")
         self.push_screen(BookFormScreen(book=book_to_edit), on_dismiss)
     
     def action_delete_book(self):
-        if self.table.cursor_row < 0:
+        if not 0 <= self.table.cursor_row < len(self._displayed_books):
             self.notify("Seleziona un libro da cancellare.", title="Attenzione", severity="warning")
             return
             
-        book_id = int(self.table.get_row_key(self.table.cursor_row))
-        book_to_delete = next((b for b in self.books if b.book_id == book_id), None)
+        book_id = self._displayed_books[self.table.cursor_row].book_id
+        book_to_delete = self._by_id.get(book_id)
         if not book_to_delete: return
 
         def on_dismiss(should_delete: bool):
             if should_delete:
-                self.books = [b for b in self.books if b.book_id != book_to_delete.book_id]
-                self.refresh_table()
+                del self._by_id[book_to_delete.book_id]
+                self.remove_sorted(book_to_delete)
+                del self._position[book_to_delete.book_id]
+                self.populate_table()
                 self.notify(f"Libro '{book_to_delete.title}' cancellato.", title="Successo")
         self.push_screen(ConfirmDeleteScreen(book_title=book_to_delete.title), on_dismiss)
 
@@ -416,8 +665,9 @@ class BookTrackerApp(App):
 
         self.push_screen(SearchScreen(), search_callback)
 
-    def action_quit(self):
-        save_books_to_csv(DB_CSV, self.books)
+    async def action_quit(self):
+        # Il salvataggio avviene in un thread per non bloccare il ciclo di eventi di Textual
+        await asyncio.to_thread(save_books_to_csv, DB_CSV, self.books)
         self.exit()
 
 if __name__ == "__main__":